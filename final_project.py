@@ -1,7 +1,100 @@
+import atexit
 import json
+import math
+import os
 import random
+import time
 from abc import ABC, abstractmethod
 
+# orjson is optional, it's used for save/load if installed since it's much faster
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data):
+        return json.dumps(data, separators=(",", ":")).encode() # no whitespace, same as orjson
+
+    _loads = json.loads
+
+# Bitmasks of the 8 winning lines (bit row*3 + col is cell (row, col))
+WIN_MASKS = (
+    0b111000000, 0b000111000, 0b000000111, # rows
+    0b100100100, 0b010010010, 0b001001001, # columns
+    0b100010001, 0b001010100,              # diagonals
+)
+
+# Transposition table for the computer's search, kept for the whole session.
+# Positions are stored under their canonical() form so symmetric positions share an entry.
+# Maps (computer bits, opponent bits, computer to move) to (remaining depth searched, score, flag)
+TRANSPOSITION_TABLE = {}
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# For each cell's bit, the winning lines that go through it (2 for edges, 3 for corners, 4 for the center)
+LINES_THROUGH = {1 << i: tuple(mask for mask in WIN_MASKS if mask & 1 << i) for i in range(9)}
+
+def has_line(bits):
+    """Checks if a single player's bits cover any winning line."""
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+# Board output: "|" between each row's cells, dashes between rows
+BOARD_TEMPLATE = "{} | {} | {}\n---------\n{} | {} | {}\n---------\n{} | {} | {}"
+CELL_CHARS = " XO" # empty, X bit set, O bit set
+
+# Lookup tables between cell index (row*3 + col), (row, col) and the cell's bit
+IDX_TO_RC = tuple((i // 3, i % 3) for i in range(9))
+BIT_OF = tuple(1 << i for i in range(9))
+
+# Cells in the order the computer tries them: center, corners, then edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+def build_symmetry_tables():
+    """Builds the 8 symmetries of the board (4 rotations, each with and without a mirror).
+    Each one is a 512-entry table from a player's bits to the transformed bits.
+    Also returns, for each symmetry, the index of the one that undoes it."""
+    rotate = tuple(col * 3 + (2 - row) for row, col in IDX_TO_RC) # quarter turn clockwise
+    mirror = tuple(row * 3 + (2 - col) for row, col in IDX_TO_RC) # left-right flip
+    perms = []
+    perm = tuple(range(9))
+    for turn in range(4):
+        perms.append(perm)
+        perms.append(tuple(mirror[cell] for cell in perm))
+        perm = tuple(rotate[cell] for cell in perm)
+
+    tables = []
+    for perm in perms:
+        table = []
+        for bits in range(512):
+            moved = 0
+            for index in range(9):
+                if bits & BIT_OF[index]:
+                    moved |= BIT_OF[perm[index]]
+            table.append(moved)
+        tables.append(tuple(table))
+
+    inverses = []
+    for perm in perms:
+        undo = tuple(perm.index(cell) for cell in range(9))
+        inverses.append(perms.index(undo))
+    return tuple(tables), tuple(inverses)
+
+SYMMETRY_TABLES, INVERSE_SYMMETRY = build_symmetry_tables()
+
+def canonical(mine, theirs):
+    """Returns the smallest (mine, theirs) pair over all 8 symmetries of the board,
+    plus the index of the symmetry that produced it. Symmetric positions share one pair."""
+    best = None
+    for sym, table in enumerate(SYMMETRY_TABLES):
+        pair = (table[mine], table[theirs])
+        if best is None or pair < best:
+            best = pair
+            best_sym = sym
+    return best[0], best[1], best_sym
+
 class InvalidMoveError(Exception):
     """Raised when a move is invalid."""
     pass
@@ -13,76 +106,112 @@ class Board:
     Has functionality for dictionary conversion to enable serialization."""
 
     size = 3
+    full_mask = 0x1FF # all 9 cell bits set
 
     def __init__(self):
         """
-        List comprehension used for brevity. 
-        The inner loop adds " " to the list 3 times to create a row, 
-        and the outer loop repeats row creation 3 times to make the grid.
+        Each player's marks are stored as a 9-bit integer, one bit per cell.
+        Cell (row, col) is bit row*3 + col, so placing a mark is a single OR
+        and checking a cell is a single AND.
         """
-        self._grid = [[" " for board_space in range(self.size)] for board_space in range(self.size)]
+        self._x = 0
+        self._o = 0
+        self._move_count = 0
+        self.last_move = None # (row, col) of the most recent mark, used by the move log
+        self._str_cache = None # rendered board, cleared whenever a mark is placed
 
     @property
     def grid(self):
-        return self._grid
+        """Builds the list-of-lists view of the board from the bitboards.
+        Only used for display, serialization and tests."""
+        grid = []
+        for row in range(self.size):
+            cells = []
+            for col in range(self.size):
+                bit = BIT_OF[row * self.size + col]
+                if self._x & bit:
+                    cells.append("X")
+                elif self._o & bit:
+                    cells.append("O")
+                else:
+                    cells.append(" ")
+            grid.append(cells)
+        return grid
+
+    @property
+    def x_bits(self):
+        return self._x
+
+    @property
+    def o_bits(self):
+        return self._o
 
     def place_mark(self, row, col, mark):
-        """Places mark on the board."""
+        """Places mark on the board. Returns the bit of the cell it was placed on."""
         if not (0 <= row < self.size and 0 <= col < self.size):
             raise InvalidMoveError("Move out of bounds.")
-        if self._grid[row][col] != " ":
+        bit = BIT_OF[row * self.size + col]
+        if (self._x | self._o) & bit:
             raise InvalidMoveError("Cell already taken.")
-        self._grid[row][col] = mark
+        if mark == "X":
+            self._x |= bit
+        else:
+            self._o |= bit
+        self._move_count += 1
+        self.last_move = (row, col)
+        self._str_cache = None
+        return bit
 
     def check_winner(self):
-        """Checks if there is a winner by looking for all-matching rows, columns and diagonals."""
-
-        # Rows
-        for row in self._grid:
-            # if first cell in row not blank (meaning row isn't blank) and rows all equal
-            if row[0] != " " and row[0] == row[1] == row[2]:
-                return row[0]
-
-        # Columns
-        for col in range(self.size):
-            # if top cell is not blank (meaning column isnt blank) and columns all equal
-            if self._grid[0][col] != " " and self._grid[0][col] == self._grid[1][col] == self._grid[2][col]:
-                return self._grid[0][col]
-
-        # Diagonals
-        if self._grid[0][0] != " " and self._grid[0][0] == self._grid[1][1] == self._grid[2][2]:
-            return self._grid[0][0]
-        if self._grid[0][2] != " " and self._grid[0][2] == self._grid[1][1] == self._grid[2][0]:
-            return self._grid[0][2]
-
+        """Checks if there is a winner by testing each player's bits against every winning line."""
+        for mask in WIN_MASKS:
+            if self._x & mask == mask:
+                return "X"
+            if self._o & mask == mask:
+                return "O"
         return None # no winner yet, game keeps going until one of the above conditions is met
 
+    def winner_after(self, bit, mark):
+        """Checks if the mark just placed on bit won the game.
+        Only the lines through that cell can have been completed by it."""
+        bits = self._x if mark == "X" else self._o
+        for mask in LINES_THROUGH[bit]:
+            if bits & mask == mask:
+                return mark
+        return None
+
     def is_full(self):
         """Checks if board is full."""
-        for row in self._grid:
-            for cell in row:
-                if cell == " ":
-                    return False
-        return True # if no blank spots, then full
+        return self._move_count == self.size * self.size # one move per cell, then full
 
     def __str__(self):
-        """Returns board visual output so it doesn't return a memory address."""
-        lines = []
-        for row in self._grid:
-            lines.append(" | ".join(row)) # "|" symbol added between each row's cells
-        return "\n---------\n".join(lines) # dashes added between each element in lines (meaning, each row)
+        """Returns board visual output so it doesn't return a memory address.
+        The output is cached until the next mark is placed."""
+        if self._str_cache is None:
+            # each cell's X bit and O bit together give its index into CELL_CHARS
+            cells = [CELL_CHARS[(self._x >> i & 1) | (self._o >> i & 1) << 1] for i in range(self.size * self.size)]
+            self._str_cache = BOARD_TEMPLATE.format(*cells)
+        return self._str_cache
 
     # JSON SERIALIZATION - DICTIONARY CONVERSION
     def to_dict(self):
         """Convert to dictionary to enable autosave functionalities.
         JSON cannot read board directly, so conversion necessary."""
-        return {"grid": self._grid}
+        return {"grid": self.grid}
 
     @classmethod
     def from_dict(cls, data):
         """Get data from dictionary."""
         board = cls() # creates an instance of whatever class the method is being called on
-        board._grid = data["grid"] # replaces default grid with the saved grid from dictionary
+        # rebuilds the bitboards from the saved grid
+        for row, cells in enumerate(data["grid"]):
+            for col, cell in enumerate(cells):
+                bit = BIT_OF[row * board.size + col]
+                if cell == "X":
+                    board._x |= bit
+                elif cell == "O":
+                    board._o |= bit
+        board._move_count = bin(board._x | board._o).count("1")
         return board
 
 # PLAYER CLASSES
@@ -95,49 +224,195 @@ class Player(ABC):
     @abstractmethod
     def make_move(self, board):
         """Forces HumanPlayer and ComputerPlayer into having
-        their own specific make_move functions."""
+        their own specific make_move functions. Returns the bit place_mark returned."""
         pass
 
 class HumanPlayer(Player): # Inheritance
     """Represents a human player and their ability to make a move on the board."""
     def make_move(self, board):
-        """Allows the human player to add a mark on the board at their desired spot."""
+        """Allows the human player to add a mark on the board at their desired spot.
+        Row and column are entered on one line, either as "1 2" or "12"."""
         while True:
+            entry = input(f"{self.name} ({self.mark}) - Enter row and column (0-2): ").split()
+            if len(entry) == 1 and len(entry[0]) == 2: # "12" written without a space
+                entry = list(entry[0])
             try:
-                row = int(input(f"{self.name} ({self.mark}) - Enter row (0-2): "))
-                col = int(input(f"{self.name} ({self.mark}) - Enter column (0-2): "))
-                board.place_mark(row, col, self.mark)
-                break
+                if len(entry) != 2:
+                    raise ValueError
+                return board.place_mark(int(entry[0]), int(entry[1]), self.mark)
             except ValueError:
-                print("Invalid input. Please enter numbers.")
+                print("Invalid input. Please enter the row and column as two numbers.")
             except InvalidMoveError as e: # Error if cell occupied or out of bounds
                 print("Error:", e)
 
 class ComputerPlayer(Player): # Inheritance
-    """Represents a computer player and their ability to make a move on the board at random."""
+    """Represents a computer player that picks its moves with alpha-beta minimax."""
+
+    time_limit = 0.05 # seconds, no deeper search is started after this
+
     def make_move(self, board):
-        """Adds all current blank cells on the board to a list,
-        which the computer uses as a reference to find where
-        it can place a mark at random."""
+        """Looks up the best cells for the current position in POLICY.
+        Positions missing from it are searched one move deeper at a time until
+        the result is certain, the whole game has been searched, or time runs out.
+        Then places a mark on one of the best cells, chosen at random so play isn't always the same."""
 
         print(f"\n{self.name} ({self.mark}) is making a move...")
-        empty_cells = []
-        for row in range(board.size):
-            for col in range(board.size):
-                if board.grid[row][col] == " ": # grid property used here
-                    empty_cells.append((row, col))
+        if self.mark == "X":
+            mine, theirs = board.x_bits, board.o_bits
+        else:
+            mine, theirs = board.o_bits, board.x_bits
+
+        canon_mine, canon_theirs, sym = canonical(mine, theirs)
+        best_moves = POLICY.get((canon_mine, canon_theirs))
+        if best_moves is not None:
+            # policy moves are for the canonical board, so turn them back to this one
+            undo = SYMMETRY_TABLES[INVERSE_SYMMETRY[sym]]
+            best_moves = [undo[bit] for bit in best_moves]
+        else: # position can't come up in a normal game, e.g. an edited save
+            depth = bin(mine | theirs).count("1") # number of marks already on the board
+
+            # Iterative deepening, the transposition table keeps earlier results between depths
+            deadline = time.monotonic() + self.time_limit
+            best_moves = []
+            for limit in range(depth + 1, Board.size * Board.size + 1):
+                best_score, best_moves = self.search_root(mine, theirs, depth, limit, best_moves)
+                # no quicker win can exist than one found within the searched depth
+                if best_score >= 10 - limit or time.monotonic() > deadline:
+                    break
+
+        # Choose randomly between equally good cells
+        row, col = IDX_TO_RC[random.choice(best_moves).bit_length() - 1]
+        return board.place_mark(row, col, self.mark)
+
+    @classmethod
+    def search_root(cls, mine, theirs, depth, limit, first_moves=()):
+        """Scores the computer's moves searching up to limit marks on the board.
+        Returns the best score and every move bit that reaches it.
+        first_moves (the previous iteration's best) are searched first, so the
+        rest only need to be checked for being at least as good."""
+        best_score = -math.inf
+        best_moves = []
+        moves = list(first_moves)
+        occupied = mine | theirs
+        for index in MOVE_ORDER:
+            bit = BIT_OF[index]
+            if not occupied & bit and bit not in moves:
+                moves.append(bit)
+        for bit in moves:
+            # anything scoring below best_score can be cut off early
+            score = cls.minimax(mine | bit, theirs, depth + 1, best_score - 1, math.inf, False, limit)
+            if score > best_score:
+                best_score = score
+                best_moves = [bit]
+            elif score == best_score:
+                best_moves.append(bit)
+        return best_score, best_moves
 
-        # Choose random empty cell
-        row, col = random.choice(empty_cells)
-        board.place_mark(row, col, self.mark)
+    @classmethod
+    def minimax(cls, mine, theirs, depth, alpha, beta, maximizing, limit=Board.size * Board.size):
+        """Scores a position from the computer's point of view.
+        mine and theirs are the computer's and the opponent's bits, depth is the
+        number of marks on the board. Wins score 10 - depth and losses depth - 10,
+        so quicker wins and slower losses are preferred. A draw scores 0, as does
+        a position at the depth limit, since its result isn't known yet.
+        Results are stored in TRANSPOSITION_TABLE so positions reached by
+        different move orders are only searched once."""
+        if has_line(mine):
+            return 10 - depth
+        if has_line(theirs):
+            return depth - 10
+        occupied = mine | theirs
+        if occupied == Board.full_mask or depth >= limit:
+            return 0
+
+        key = canonical(mine, theirs)[:2] + (maximizing,)
+        remaining = limit - depth
+        entry = TRANSPOSITION_TABLE.get(key)
+        if entry is not None and entry[0] >= remaining:
+            score, flag = entry[1], entry[2]
+            if flag == EXACT:
+                return score
+            if flag == LOWER_BOUND:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+        alpha_start, beta_start = alpha, beta
+
+        # strong cells first so alpha-beta cuts off sooner
+        if maximizing: # computer to move
+            best = -math.inf
+            for index in MOVE_ORDER:
+                bit = BIT_OF[index]
+                if occupied & bit:
+                    continue
+                best = max(best, cls.minimax(mine | bit, theirs, depth + 1, alpha, beta, False, limit))
+                alpha = max(alpha, best)
+                if alpha >= beta: # opponent will never allow this line
+                    break
+        else: # opponent to move
+            best = math.inf
+            for index in MOVE_ORDER:
+                bit = BIT_OF[index]
+                if occupied & bit:
+                    continue
+                best = min(best, cls.minimax(mine, theirs | bit, depth + 1, alpha, beta, True, limit))
+                beta = min(beta, best)
+                if alpha >= beta: # computer already has a better option elsewhere
+                    break
+
+        # a cutoff only proves a bound, not the exact score
+        if best <= alpha_start:
+            flag = UPPER_BOUND
+        elif best >= beta_start:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        TRANSPOSITION_TABLE[key] = (remaining, best, flag)
+        return best
+
+def build_policy():
+    """Searches every position reachable from an empty board with X moving first.
+    Returns a dictionary mapping the canonical (bits of the player to move, bits of the other player)
+    to a tuple of that player's best move bits on the canonical board."""
+    policy = {}
+    stack = [(0, 0)]
+    while stack:
+        mine, theirs = stack.pop()
+        occupied = mine | theirs
+        # skip positions already done and finished games (only the last mover can have won)
+        if (mine, theirs) in policy or has_line(theirs) or occupied == Board.full_mask:
+            continue
+        depth = bin(occupied).count("1")
+        best_moves = ComputerPlayer.search_root(mine, theirs, depth, Board.size * Board.size)[1]
+        policy[(mine, theirs)] = tuple(best_moves)
+        for index in MOVE_ORDER:
+            bit = BIT_OF[index]
+            if not occupied & bit:
+                stack.append(canonical(theirs, mine | bit)[:2]) # other player's turn next
+    return policy
+
+# Best moves for every reachable position, built once when the module is imported
+POLICY = build_policy()
 
 # GAME CLASS
 class Game:
     """Has functionalities for player-switching, and drives gameplay. Allows for autosave and loading."""
-    def __init__(self, player1, player2):
+
+    autosave_interval = 2 # moves between move log flushes, one full turn pair
+
+    def __init__(self, player1, player2, save_name="savegame"):
         self.board = Board()
         self.players = [player1, player2]
         self.current_index = 0
+        # players and starting board are saved once to the meta file,
+        # then each move is appended as one line to the move log
+        self.autosave_file = save_name + ".meta.json"
+        self._move_log_path = save_name + ".moves.jsonl"
+        self._move_log = None
+        self._move_log_size = None # bytes of complete moves in the log, set when loaded from one
+        self._moves_since_save = 0
 
     @property
     def current_player(self):
@@ -150,16 +425,18 @@ class Game:
 
     def play(self):
         """Main gameplay-driving function.
-        Prints board, lets the current player make move, then autosaves.
+        Prints board, lets the current player make move, then logs the move for autosave.
         Checks for winners, or if board is full, and gives a result accordingly."""
+        self._start_move_log()
+        # makes sure unsaved moves are still written if the program exits mid-game
+        atexit.register(self._flush_autosave)
         while True:
             print("\n" + str(self.board)) # __str__ used here to print board
-            self.current_player.make_move(self.board)
-
-            # auto-save after every move
-            self.save("savegame.json")
+            bit = self.current_player.make_move(self.board)
+            self._log_move()
 
-            winner = self.board.check_winner()
+            # only the mark just placed can have completed a line
+            winner = self.board.winner_after(bit, self.current_player.mark)
             if winner:
                 print("\n" + str(self.board)) # prints final board
                 print(f"\n{self.current_player.name} wins!")
@@ -172,10 +449,50 @@ class Game:
 
             self.switch_player()
 
+        # final board is always saved when the game ends
+        self._flush_autosave()
+        atexit.unregister(self._flush_autosave)
+        self._move_log.close()
+        self._move_log = None
+
+    # AUTOSAVE - MOVE LOG
+    def _start_move_log(self):
+        """Opens the move log for the moves that follow.
+        A loaded game keeps appending to the log it was loaded from, cut back to its last complete move.
+        A new game empties the log first and only then saves players and the starting board
+        to the meta file, so a crash in between never pairs the new meta file with old moves."""
+        if self._move_log_size is not None:
+            self._move_log = open(self._move_log_path, "r+b")
+            self._move_log.truncate(self._move_log_size)
+            self._move_log.seek(self._move_log_size)
+            self._move_log_size = None
+        else:
+            self._move_log = open(self._move_log_path, "wb")
+            self.save(self.autosave_file, move_log=self._move_log_path)
+        self._moves_since_save = 0
+
+    def _log_move(self):
+        """Appends the move that was just made to the move log.
+        The log is buffered and only flushed once every autosave_interval moves."""
+        row, col = self.board.last_move
+        move = {"row": row, "col": col, "mark": self.current_player.mark}
+        self._move_log.write(_dumps(move) + b"\n")
+        self._moves_since_save += 1
+        if self._moves_since_save >= self.autosave_interval:
+            self._flush_autosave()
+
+    def _flush_autosave(self):
+        """Writes any buffered moves to the move log file."""
+        if self._moves_since_save:
+            self._move_log.flush()
+            self._moves_since_save = 0
 
     # JSON SERIALIZATION - AUTOSAVE
-    def save(self, filename):
-        """Saves data to json. Saves in dictionary format."""
+    def save(self, filename, move_log=None):
+        """Saves data to json. Saves in dictionary format.
+        If a move log path is given, it is stored so load can replay the moves in it.
+        The data is written to a temporary file in one write, then swapped in,
+        so an interrupted save never leaves a half-written file behind."""
         data = {
             "board": self.board.to_dict(),
             "players": [
@@ -184,14 +501,21 @@ class Game:
             ],
             "current_index": self.current_index
         }
-        with open(filename, "w") as f:
-            json.dump(data, f)
+        if move_log is not None:
+            data["moves"] = move_log
+        blob = _dumps(data)
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, "wb", buffering=0) as f:
+            f.write(blob)
+        os.replace(tmp_filename, filename)
 
     @classmethod
     def load(cls, filename):
-        """Loads data from json. Checks if computer or human, and appends accordingly."""
-        with open(filename, "r") as f:
-            data = json.load(f)
+        """Loads data from json. Checks if computer or human, and appends accordingly.
+        Replays the saved move log on top of the saved board, if there is one.
+        A partly written last move is skipped, and a log that doesn't fit the board can't be loaded."""
+        with open(filename, "rb") as f:
+            data = _loads(f.read())
 
         players = []
         for player_data in data["players"]: # checks for player data within the json
@@ -205,6 +529,24 @@ class Game:
         game.board = Board.from_dict(data["board"])
         game.current_index = data["current_index"]
 
+        # each logged move is applied in order, switching turns after each one
+        if "moves" in data:
+            game.autosave_file = filename
+            game._move_log_path = data["moves"]
+            game._move_log_size = 0
+            with open(data["moves"], "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"): # write was interrupted, only this move is lost
+                        break
+                    if line.strip():
+                        move = _loads(line)
+                        try:
+                            game.board.place_mark(move["row"], move["col"], move["mark"])
+                        except InvalidMoveError as e:
+                            raise ValueError(f"Cannot load saved game: move log doesn't match the saved board ({e})")
+                        game.switch_player()
+                    game._move_log_size += len(line)
+
         # checks if saved game has already been won by a player, prevents loading
         winner = game.board.check_winner()
         if winner:
@@ -248,7 +590,7 @@ if __name__ == "__main__":
 
         elif choice == "2":
             try:
-                game = Game.load("savegame.json")
+                game = Game.load("savegame.meta.json")
                 print("\nLoaded saved game successfully!")
             except FileNotFoundError:
                 print("\nNo saved game found. Please choose to start a new game, or exit if you wish.")
@@ -1,5 +1,5 @@
 import pytest
-from final_project import Board, Game, HumanPlayer, InvalidMoveError
+from final_project import Board, ComputerPlayer, Game, HumanPlayer, InvalidMoveError
 
 # BOARD TEST
 
@@ -25,32 +25,72 @@ def test_mark_on_taken_cell_raises_error():
         board.place_mark(0, 0, "O")
 
 def test_check_winner_row():
-    board = Board()
-    board._grid = [["X","X","X"], [" ","O"," "], ["O"," "," "]]
+    board = Board.from_dict({"grid": [["X","X","X"], [" ","O"," "], ["O"," "," "]]})
     assert board.check_winner() == "X"
 
 def test_check_winner_column():
-    board = Board()
-    board._grid = [["O","X"," "], ["O","X"," "], ["O"," ","X"]]
+    board = Board.from_dict({"grid": [["O","X"," "], ["O","X"," "], ["O"," ","X"]]})
     assert board.check_winner() == "O"
 
 def test_check_winner_diagonal():
-    board = Board()
-    board._grid = [["X","O","O"], ["O","X"," "], [" "," ","X"]]
+    board = Board.from_dict({"grid": [["X","O","O"], ["O","X"," "], [" "," ","X"]]})
     assert board.check_winner() == "X"
 
+def test_winner_after_checks_lines_through_placed_cell():
+    board = Board.from_dict({"grid": [["X","O"," "], [" ","X","O"], [" "," "," "]]})
+    bit = board.place_mark(2, 2, "X")
+    assert board.winner_after(bit, "X") == "X"
+    bit = board.place_mark(2, 1, "O")
+    assert board.winner_after(bit, "O") is None
+
 def test_board_is_full_true():
-    board = Board()
-    board._grid = [["X","O","X"], ["O","X","O"], ["O","X","O"]]
+    board = Board.from_dict({"grid": [["X","O","X"], ["O","X","O"], ["O","X","O"]]})
     assert board.is_full() is True
 
 def test_board_is_full_false():
-    board = Board()
-    board._grid = [["X","O"," "], ["O","X","O"], ["O","X","O"]]
+    board = Board.from_dict({"grid": [["X","O"," "], ["O","X","O"], ["O","X","O"]]})
     assert board.is_full() is False
 
+def test_board_str_updates_after_move():
+    board = Board()
+    assert str(board) == "  |   |  \n---------\n  |   |  \n---------\n  |   |  "
+    board.place_mark(1, 2, "O")
+    assert str(board) == "  |   |  \n---------\n  |   | O\n---------\n  |   |  "
+
+def test_board_dict_round_trip():
+    board = Board()
+    board.place_mark(1, 1, "X")
+    board.place_mark(0, 2, "O")
+    restored = Board.from_dict(board.to_dict())
+    assert restored.grid == [[" "," ","O"], [" ","X"," "], [" "," "," "]]
+
 # PLAYER AND GAME TEST
 
+def test_human_move_reads_row_and_column_from_one_line(monkeypatch):
+    entries = iter(["oops", "1 2", "20"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(entries))
+    board = Board()
+    HumanPlayer("A","X").make_move(board)
+    HumanPlayer("B","O").make_move(board)
+    assert board.grid[1][2] == "X"
+    assert board.grid[2][0] == "O"
+
+def test_computer_takes_winning_move():
+    board = Board.from_dict({"grid": [["O","O"," "], ["X","X"," "], ["X"," "," "]]})
+    ComputerPlayer("C","O").make_move(board)
+    assert board.check_winner() == "O"
+
+def test_computer_searches_position_missing_from_policy():
+    # O never moves with no O marks down after X has played twice, so this is searched
+    board = Board.from_dict({"grid": [["X","X"," "], [" "," "," "], [" "," "," "]]})
+    ComputerPlayer("C","O").make_move(board)
+    assert board.grid[0][2] == "O"
+
+def test_computer_blocks_opponent():
+    board = Board.from_dict({"grid": [["X","X"," "], [" ","O"," "], [" "," "," "]]})
+    ComputerPlayer("C","O").make_move(board)
+    assert board.grid[0][2] == "O"
+
 def test_switch_player_changes_current():
     p1 = HumanPlayer("A","X")
     p2 = HumanPlayer("B","O")
@@ -63,13 +103,37 @@ def test_game_winner_detection():
     p1 = HumanPlayer("A","X")
     p2 = HumanPlayer("B","O")
     game = Game(p1,p2)
-    game.board._grid = [["X","X","X"], ["O"," "," "], ["O"," "," "]]
+    game.board = Board.from_dict({"grid": [["X","X","X"], ["O"," "," "], ["O"," "," "]]})
     assert game.board.check_winner() == "X"
 
 def test_game_draw_detection():
     p1 = HumanPlayer("A","X")
     p2 = HumanPlayer("B","O")
     game = Game(p1,p2)
-    game.board._grid = [["X","O","X"], ["X","O","O"], ["O","X","X"]]
+    game.board = Board.from_dict({"grid": [["X","O","X"], ["X","O","O"], ["O","X","X"]]})
     assert game.board.check_winner() is None
     assert game.board.is_full() is True
+
+def test_play_autosaves_final_board(tmp_path):
+    game = Game(ComputerPlayer("A","X"), ComputerPlayer("B","O"), save_name=str(tmp_path / "savegame"))
+    game.play()
+    loaded = Game.load(game.autosave_file)
+    assert loaded.board.grid == game.board.grid
+
+def test_load_skips_partly_written_last_move(tmp_path):
+    game = Game(HumanPlayer("A","X"), HumanPlayer("B","O"))
+    moves_file = tmp_path / "savegame.moves.jsonl"
+    game.save(str(tmp_path / "savegame.meta.json"), move_log=str(moves_file))
+    moves_file.write_bytes(b'{"row":1,"col":1,"mark":"X"}\n{"row":0,"co')
+    loaded = Game.load(str(tmp_path / "savegame.meta.json"))
+    assert loaded.board.grid == [[" "," "," "], [" ","X"," "], [" "," "," "]]
+    assert loaded.current_player.mark == "O"
+
+def test_load_rejects_move_log_that_does_not_fit_board(tmp_path):
+    game = Game(HumanPlayer("A","X"), HumanPlayer("B","O"))
+    game.board.place_mark(1, 1, "X")
+    moves_file = tmp_path / "savegame.moves.jsonl"
+    game.save(str(tmp_path / "savegame.meta.json"), move_log=str(moves_file))
+    moves_file.write_bytes(b'{"row":1,"col":1,"mark":"O"}\n')
+    with pytest.raises(ValueError):
+        Game.load(str(tmp_path / "savegame.meta.json"))